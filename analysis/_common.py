@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Shared JSONL loading and network building for the analysis scripts.
+
+Every script projects the same columns (post id, author name, post_id,
+submolt), so the parsed tables, the Parquet sidecar caches and the
+factorized network representation all live here instead of being
+copy-pasted per script. load_columns is memoized per data directory, so
+running several analyses in one process parses each file once.
+"""
+
+import json
+import mmap
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from orjson import loads as json_loads  # ~3-5x faster than stdlib on JSONL
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Only the fields the analysis scripts touch; everything else is skipped at
+# parse time instead of being materialized into Python objects.
+POSTS_SCHEMA = COMMENTS_SCHEMA = None
+if HAS_PYARROW:
+    POSTS_SCHEMA = pa.schema([
+        ("id", pa.string()),
+        ("author", pa.struct([("name", pa.string())])),
+        ("_submolt", pa.string()),
+    ])
+    COMMENTS_SCHEMA = pa.schema([
+        ("author", pa.struct([("name", pa.string())])),
+        ("_post_id", pa.string()),
+        ("post_id", pa.string()),
+        ("_submolt", pa.string()),
+    ])
+
+def _iter_lines(path):
+    """Iterate JSONL lines over a read-only memory map (zero-copy I/O)."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        yield from iter(mm.readline, b"")
+
+def _read_jsonl(path, schema):
+    """Columnar JSONL read with a Parquet sidecar cache keyed on mtime."""
+    cache = path.with_suffix(".parquet")
+    if cache.exists() and cache.stat().st_mtime >= path.stat().st_mtime:
+        return pq.read_table(cache)
+
+    tbl = pa_json.read_json(
+        path,
+        read_options=pa_json.ReadOptions(block_size=8 << 20),
+        parse_options=pa_json.ParseOptions(
+            explicit_schema=schema, unexpected_field_behavior="ignore"),
+    )
+    try:
+        pq.write_table(tbl, cache)
+    except OSError:
+        pass  # read-only data dir; caching is best-effort
+    return tbl
+
+@lru_cache(maxsize=None)
+def load_columns(data_dir):
+    """Load posts and comments from data_dir as projected column dicts.
+
+    Memoized per directory so one process run parses each file once.
+    """
+    data_dir = Path(data_dir)
+    posts_file = data_dir / "posts.jsonl"
+    comments_file = data_dir / "comments.jsonl"
+
+    posts = {"id": [], "author": [], "submolt": []}
+    comments = {"author": [], "post_id": [], "submolt": []}
+
+    if posts_file.exists():
+        if HAS_PYARROW:
+            pt = _read_jsonl(posts_file, POSTS_SCHEMA)
+            posts = {
+                "id": pt.column("id").to_pylist(),
+                "author": pc.struct_field(pt.column("author"), "name").to_pylist(),
+                "submolt": pt.column("_submolt").to_pylist(),
+            }
+        else:
+            for line in _iter_lines(posts_file):
+                p = json_loads(line)
+                posts["id"].append(p.get("id"))
+                posts["author"].append((p.get("author") or {}).get("name"))
+                posts["submolt"].append(p.get("_submolt"))
+
+    if comments_file.exists():
+        if HAS_PYARROW:
+            ct = _read_jsonl(comments_file, COMMENTS_SCHEMA)
+            comments = {
+                "author": pc.struct_field(ct.column("author"), "name").to_pylist(),
+                "post_id": pc.coalesce(ct.column("_post_id"), ct.column("post_id")).to_pylist(),
+                "submolt": ct.column("_submolt").to_pylist(),
+            }
+        else:
+            for line in _iter_lines(comments_file):
+                c = json_loads(line)
+                comments["author"].append((c.get("author") or {}).get("name"))
+                comments["post_id"].append(c.get("_post_id") or c.get("post_id"))
+                comments["submolt"].append(c.get("_submolt"))
+
+    return posts, comments
+
+def _factorize(posts, comments):
+    """Factorize authors and post ids to dense int32 codes (-1 = missing).
+
+    Returns (comment_author, comment_post, author_by_post, names) where
+    author_by_post maps post code -> author code via array indexing.
+    """
+    author_codes, names = pd.factorize(np.concatenate([
+        np.asarray(posts["author"], dtype=object),
+        np.asarray(comments["author"], dtype=object),
+    ]))
+    n_posts = len(posts["id"])
+    post_author = author_codes[:n_posts].astype(np.int32)
+    comment_author = author_codes[n_posts:].astype(np.int32)
+
+    pid_codes, pid_uniques = pd.factorize(np.concatenate([
+        np.asarray(posts["id"], dtype=object),
+        np.asarray(comments["post_id"], dtype=object),
+    ]))
+    author_by_post = np.full(len(pid_uniques), -1, dtype=np.int32)
+    # Posts with a null id factorize to code -1; an unmasked scatter
+    # would write author_by_post[-1] and mis-attribute the last post.
+    post_codes = pid_codes[:n_posts]
+    valid = post_codes >= 0
+    author_by_post[post_codes[valid]] = post_author[valid]
+    comment_post = pid_codes[n_posts:]
+
+    return comment_author, comment_post, author_by_post, np.asarray(names)
+
+if HAS_NUMBA:
+    # Fuses the post-author lookup, the unknown/self-edge filter and both
+    # degree counts into one cache-friendly pass over int32 arrays.
+    # Serial on purpose: the scatter increments would race under prange.
+    @njit(cache=True)
+    def _degree_kernel(comment_author, comment_post, author_by_post, n_nodes):
+        out_counts = np.zeros(n_nodes, np.int64)
+        in_counts = np.zeros(n_nodes, np.int64)
+        for i in range(comment_author.shape[0]):
+            c = comment_author[i]
+            p = comment_post[i]
+            if c < 0 or p < 0:
+                continue
+            a = author_by_post[p]
+            if a < 0 or a == c:
+                continue
+            out_counts[c] += 1
+            in_counts[a] += 1
+        return out_counts, in_counts
+
+def build_degrees(posts, comments):
+    """Degrees of the comment network (commenter -> post author) in one pass.
+
+    Returns (out_counts, in_counts, names) over the full author-id space;
+    callers filter degree > 0 where they only want connected nodes.
+    """
+    comment_author, comment_post, author_by_post, names = _factorize(posts, comments)
+
+    n_nodes = len(names)
+    if HAS_NUMBA:
+        out_counts, in_counts = _degree_kernel(
+            comment_author, comment_post, author_by_post, n_nodes)
+    else:
+        src, dst = _mask_edges(comment_author, comment_post, author_by_post)
+        out_counts = np.bincount(src, minlength=n_nodes)
+        in_counts = np.bincount(dst, minlength=n_nodes)
+
+    return out_counts, in_counts, names
+
+def _mask_edges(comment_author, comment_post, author_by_post):
+    """Filter comment edges with one fused boolean AND over int codes.
+
+    The old pipeline compared every record against the "unknown" string
+    sentinel several times; here missing values are the integer code -1
+    and the whole filter is a single vectorized mask.
+    """
+    dst = author_by_post[np.maximum(comment_post, 0)]
+    mask = ((comment_author >= 0) & (comment_post >= 0)
+            & (dst >= 0) & (dst != comment_author))
+    return comment_author[mask], dst[mask]
+
+def build_edges(posts, comments):
+    """Comment network as (src, dst, names) int32 edge arrays.
+
+    One entry per comment (duplicates carry the edge weight implicitly);
+    ids are compacted to nodes that actually appear on an edge.
+    """
+    comment_author, comment_post, author_by_post, names = _factorize(posts, comments)
+
+    src, dst = _mask_edges(comment_author, comment_post, author_by_post)
+
+    nodes, inv = np.unique(np.concatenate([src, dst]), return_inverse=True)
+    inv = inv.astype(np.int32)
+
+    return inv[:len(src)], inv[len(src):], names[nodes]
+
+def degree_counts(src, dst, n_nodes):
+    """Dense out/in degree arrays via one bincount pass per direction."""
+    return np.bincount(src, minlength=n_nodes), np.bincount(dst, minlength=n_nodes)
+
+def top_k_ids(counts, k=10):
+    """Ids of the k largest entries, O(n) selection instead of a full sort."""
+    k = min(k, len(counts))
+    idx = np.argpartition(counts, -k)[-k:]
+    return idx[np.argsort(counts[idx])[::-1]]
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Run every analysis over the sampler dataset in one process:
+
+    python analysis/all.py
+
+load_columns is memoized per data directory, so the JSONL files are
+parsed once and shared by all the analyses below.
+"""
+
+import degree_distribution
+import network_stats
+
+def main():
+    for mod in (degree_distribution, network_stats):
+        print("\n" + "#" * 60)
+        print(f"# {mod.__name__}")
+        print("#" * 60)
+        mod.main()
+
+if __name__ == "__main__":
+    main()
@@ -4,140 +4,111 @@ Degree distribution analysis with power-law fitting.
 Tests if Moltbook network follows scale-free properties.
 """
 
-import json
-import math
 from pathlib import Path
-from collections import defaultdict, Counter
+
+import numpy as np
+
+from _common import build_degrees, load_columns, top_k_ids
 
 DATA_DIR = Path.home() / ".openclaw/workspace/data/moltbook-sampler"
 
-def load_data():
-    """Load posts and comments."""
-    posts, comments = [], []
-    
-    with open(DATA_DIR / "posts.jsonl") as f:
-        for line in f:
-            posts.append(json.loads(line))
-    
-    with open(DATA_DIR / "comments.jsonl") as f:
-        for line in f:
-            comments.append(json.loads(line))
-    
-    return posts, comments
-
-def build_network(posts, comments):
-    """Build comment network: commenter -> post author."""
-    post_authors = {}
-    for p in posts:
-        author_obj = p.get("author") or {}
-        post_authors[p.get("id")] = author_obj.get("name", "unknown")
-    
-    out_degree = Counter()
-    in_degree = Counter()
-    
-    for c in comments:
-        author_obj = c.get("author") or {}
-        commenter = author_obj.get("name", "unknown") if author_obj else "unknown"
-        post_id = c.get("_post_id") or c.get("post_id")
-        post_author = post_authors.get(post_id, "unknown")
-        
-        if commenter != "unknown" and post_author != "unknown" and commenter != post_author:
-            out_degree[commenter] += 1
-            in_degree[post_author] += 1
-    
-    return out_degree, in_degree
-
-def degree_distribution(degrees):
+def degree_distribution(degree_vals):
     """Compute P(k) - fraction of nodes with degree k."""
-    counts = Counter(degrees.values())
-    total = len(degrees)
-    return {k: count / total for k, count in sorted(counts.items())}
+    vals = np.asarray(degree_vals, dtype=np.int64)
+    hist = np.bincount(vals)
+    probs = hist / vals.size
+    return {k: p for k, p in enumerate(probs) if hist[k]}
 
-def estimate_power_law_exponent(degrees, k_min=1):
+def estimate_power_law_exponent(degree_vals, k_min=1):
     """
     Estimate power-law exponent using MLE (Newman 2005).
     P(k) ~ k^(-alpha)
     alpha = 1 + n * (sum(ln(k_i / k_min)))^(-1)
     """
-    values = [k for k in degrees.values() if k >= k_min]
-    if not values:
+    values = np.asarray(degree_vals, dtype=np.float64)
+    values = values[values >= k_min]
+    n = values.size
+    if n == 0:
         return None, 0
-    
-    n = len(values)
-    sum_log = sum(math.log(k / (k_min - 0.5)) for k in values)
-    
+
+    # Single SIMD-vectorized np.log over the tail instead of per-node math.log
+    sum_log = np.log(values / (k_min - 0.5)).sum()
+
     if sum_log == 0:
         return None, n
-    
+
     alpha = 1 + n / sum_log
     return alpha, n
 
-def compute_gini(degrees):
-    """Compute Gini coefficient for degree inequality."""
-    values = sorted(degrees.values())
-    n = len(values)
+def compute_gini(degree_vals):
+    """Compute Gini coefficient for degree inequality (closed-form NumPy)."""
+    v = np.sort(np.asarray(degree_vals, dtype=np.int64))
+    n = v.size
     if n == 0:
         return 0
-    
-    cumsum = 0
-    for i, v in enumerate(values):
-        cumsum += (2 * (i + 1) - n - 1) * v
-    
-    return cumsum / (n * sum(values)) if sum(values) > 0 else 0
+
+    total = v.sum()
+    if total == 0:
+        return 0
+
+    idx = np.arange(1, n + 1, dtype=np.int64)
+    return ((2 * idx - n - 1) * v).sum() / (n * total)
 
 def main():
     print("Loading data...")
-    posts, comments = load_data()
-    print(f"Loaded {len(posts)} posts, {len(comments)} comments\n")
-    
+    posts, comments = load_columns(DATA_DIR)
+    print(f"Loaded {len(posts['id'])} posts, {len(comments['post_id'])} comments\n")
+
     print("Building network...")
-    out_degree, in_degree = build_network(posts, comments)
-    
+    out_counts, in_counts, names = build_degrees(posts, comments)
+
+    # Match the old Counter semantics: stats over nodes with degree > 0
+    out_vals = out_counts[out_counts > 0]
+    in_vals = in_counts[in_counts > 0]
+
     print(f"\n=== Degree Statistics ===")
-    print(f"Unique nodes (out): {len(out_degree)}")
-    print(f"Unique nodes (in): {len(in_degree)}")
-    
+    print(f"Unique nodes (out): {len(out_vals)}")
+    print(f"Unique nodes (in): {len(in_vals)}")
+
     # Out-degree analysis
     print(f"\n=== Out-Degree (commenting activity) ===")
-    out_vals = list(out_degree.values())
-    print(f"  Mean: {sum(out_vals)/len(out_vals):.2f}")
-    print(f"  Median: {sorted(out_vals)[len(out_vals)//2]}")
-    print(f"  Max: {max(out_vals)}")
-    
-    alpha_out, n_out = estimate_power_law_exponent(out_degree, k_min=2)
+    print(f"  Mean: {out_vals.mean():.2f}")
+    print(f"  Median: {np.median(out_vals):g}")
+    print(f"  Max: {out_vals.max()}")
+
+    alpha_out, n_out = estimate_power_law_exponent(out_vals, k_min=2)
     if alpha_out:
         print(f"  Power-law exponent (α): {alpha_out:.3f} (n={n_out})")
         print(f"  [Typical range: 2-3 for social networks]")
-    
-    gini_out = compute_gini(out_degree)
+
+    gini_out = compute_gini(out_vals)
     print(f"  Gini coefficient: {gini_out:.3f}")
-    
+
     # In-degree analysis
     print(f"\n=== In-Degree (attention received) ===")
-    in_vals = list(in_degree.values())
-    print(f"  Mean: {sum(in_vals)/len(in_vals):.2f}")
-    print(f"  Median: {sorted(in_vals)[len(in_vals)//2]}")
-    print(f"  Max: {max(in_vals)}")
-    
-    alpha_in, n_in = estimate_power_law_exponent(in_degree, k_min=2)
+    print(f"  Mean: {in_vals.mean():.2f}")
+    print(f"  Median: {np.median(in_vals):g}")
+    print(f"  Max: {in_vals.max()}")
+
+    alpha_in, n_in = estimate_power_law_exponent(in_vals, k_min=2)
     if alpha_in:
         print(f"  Power-law exponent (α): {alpha_in:.3f} (n={n_in})")
-    
-    gini_in = compute_gini(in_degree)
+
+    gini_in = compute_gini(in_vals)
     print(f"  Gini coefficient: {gini_in:.3f}")
-    
+
     # Top nodes
     print(f"\n=== Top 10 by Out-Degree (most active commenters) ===")
-    for name, deg in out_degree.most_common(10):
-        print(f"  {name}: {deg}")
-    
+    for i in top_k_ids(out_counts):
+        print(f"  {names[i]}: {out_counts[i]}")
+
     print(f"\n=== Top 10 by In-Degree (most attention) ===")
-    for name, deg in in_degree.most_common(10):
-        print(f"  {name}: {deg}")
-    
+    for i in top_k_ids(in_counts):
+        print(f"  {names[i]}: {in_counts[i]}")
+
     # Distribution tail
     print(f"\n=== Distribution Shape ===")
-    out_dist = degree_distribution(out_degree)
+    out_dist = degree_distribution(out_vals)
     k1_frac = out_dist.get(1, 0)
     k_gt10 = sum(v for k, v in out_dist.items() if k > 10)
     print(f"  Nodes with out-degree=1: {k1_frac*100:.1f}%")
@@ -3,68 +3,53 @@
 Generate figures for the paper.
 """
 
-import json
-from collections import Counter, defaultdict
 from pathlib import Path
-import math
+
+import numpy as np
+
+from _common import build_edges, degree_counts, load_columns, top_k_ids
 
 DATA_DIR = Path.home() / ".openclaw/workspace/data/moltbook-fast"
 OUT_DIR = Path.home() / ".openclaw/workspace/moltbook-paper/figures"
 
-def load_data():
-    posts = [json.loads(l) for l in open(DATA_DIR / "posts.jsonl")]
-    comments = [json.loads(l) for l in open(DATA_DIR / "comments.jsonl")]
-    return posts, comments
-
-def build_network(posts, comments):
-    post_authors = {}
-    for p in posts:
-        author = (p.get('author') or {}).get('name', 'unknown')
-        post_authors[p.get('id')] = author
-    
-    out_degrees = defaultdict(int)
-    in_degrees = defaultdict(int)
-    
-    for c in comments:
-        commenter = (c.get('author') or {}).get('name', 'unknown')
-        post_id = c.get('_post_id') or c.get('post_id')
-        post_author = post_authors.get(post_id, 'unknown')
-        
-        if commenter != 'unknown' and post_author != 'unknown' and commenter != post_author:
-            out_degrees[commenter] += 1
-            in_degrees[post_author] += 1
-    
-    return out_degrees, in_degrees
-
-def generate_degree_distribution_data(degrees, filename):
+# Single-pass LaTeX escaping via str.translate instead of chained .replace
+LATEX_ESC = str.maketrans({
+    "_": r"\_", "&": r"\&", "%": r"\%", "#": r"\#", "$": r"\$",
+})
+
+def generate_degree_distribution_data(degree_vals, filename):
     """Generate data for degree distribution plot (log-log)."""
-    counts = Counter(degrees.values())
-    total = sum(counts.values())
-    
-    with open(OUT_DIR / filename, 'w') as f:
-        f.write("degree,count,probability\n")
-        for deg in sorted(counts.keys()):
-            if deg > 0:
-                f.write(f"{deg},{counts[deg]},{counts[deg]/total}\n")
-    
-    return counts
-
-def generate_latex_table(posts, comments, out_degrees, in_degrees):
+    vals = np.asarray(degree_vals, dtype=np.int64)
+    hist = np.bincount(vals)
+    total = vals.size
+
+    degs = np.nonzero(hist)[0]
+    degs = degs[degs > 0]
+    cnts = hist[degs]
+
+    # One C-level writer call instead of an f-string per row
+    np.savetxt(OUT_DIR / filename,
+               np.column_stack([degs, cnts, cnts / total]),
+               fmt=['%d', '%d', '%.8f'], delimiter=',',
+               header='degree,count,probability', comments='')
+
+    return degs, cnts
+
+def generate_latex_table(posts, comments, out_counts, in_counts):
     """Generate LaTeX table for paper."""
-    all_nodes = set(out_degrees.keys()) | set(in_degrees.keys())
-    out_vals = [out_degrees.get(n, 0) for n in all_nodes]
-    in_vals = [in_degrees.get(n, 0) for n in all_nodes]
-    
+    # Dense arrays already cover every node (zeros for receive-only agents)
+    out_vals = out_counts
+
     # Calculate stats
-    n_submolts = len(set(p.get('_submolt') for p in posts))
-    n_agents = len(all_nodes)
-    n_posts = len(posts)
-    n_comments = len(comments)
-    
-    mean_out = sum(out_vals) / len(out_vals) if out_vals else 0
-    median_out = sorted(out_vals)[len(out_vals)//2] if out_vals else 0
-    max_out = max(out_vals) if out_vals else 0
-    
+    n_submolts = len(set(posts["submolt"]))
+    n_agents = len(out_counts)
+    n_posts = len(posts["id"])
+    n_comments = len(comments["post_id"])
+
+    mean_out = out_vals.mean() if len(out_vals) else 0
+    median_out = np.median(out_vals) if len(out_vals) else 0
+    max_out = out_vals.max() if len(out_vals) else 0
+
     latex = f"""
 \\begin{{table}}[h]
 \\centering
@@ -80,23 +65,23 @@ Posts & {n_posts:,} \\\\
 Comments & {n_comments:,} \\\\
 \\midrule
 Mean out-degree & {mean_out:.2f} \\\\
-Median out-degree & {median_out} \\\\
+Median out-degree & {median_out:g} \\\\
 Max out-degree & {max_out} \\\\
 \\bottomrule
 \\end{{tabular}}
 \\end{{table}}
 """
-    
+
     with open(OUT_DIR / "table_dataset.tex", 'w') as f:
         f.write(latex)
-    
+
     return latex
 
-def generate_top_agents_table(out_degrees, in_degrees):
+def generate_top_agents_table(out_counts, in_counts, names):
     """Generate table of top agents."""
-    top_out = sorted(out_degrees.items(), key=lambda x: -x[1])[:10]
-    top_in = sorted(in_degrees.items(), key=lambda x: -x[1])[:10]
-    
+    top_out = [(names[i], int(out_counts[i])) for i in top_k_ids(out_counts)]
+    top_in = [(names[i], int(in_counts[i])) for i in top_k_ids(in_counts)]
+
     latex = """
 \\begin{table}[h]
 \\centering
@@ -108,44 +93,45 @@ def generate_top_agents_table(out_degrees, in_degrees):
 \\textbf{Agent} & \\textbf{Count} & \\textbf{Agent} & \\textbf{Count} \\\\
 \\midrule
 """
-    
+
     for i in range(10):
         out_name, out_count = top_out[i] if i < len(top_out) else ("", "")
         in_name, in_count = top_in[i] if i < len(top_in) else ("", "")
-        # Escape underscores for LaTeX
-        out_name = out_name.replace("_", "\\_")
-        in_name = in_name.replace("_", "\\_")
+        # Escape LaTeX special characters
+        out_name = out_name.translate(LATEX_ESC)
+        in_name = in_name.translate(LATEX_ESC)
         latex += f"{out_name} & {out_count} & {in_name} & {in_count} \\\\\n"
-    
+
     latex += """\\bottomrule
 \\end{tabular}
 \\end{table}
 """
-    
+
     with open(OUT_DIR / "table_top_agents.tex", 'w') as f:
         f.write(latex)
-    
+
     return latex
 
 def main():
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    
+
     print("Loading data...")
-    posts, comments = load_data()
-    print(f"Loaded {len(posts)} posts, {len(comments)} comments")
-    
+    posts, comments = load_columns(DATA_DIR)
+    print(f"Loaded {len(posts['id'])} posts, {len(comments['post_id'])} comments")
+
     print("Building network...")
-    out_degrees, in_degrees = build_network(posts, comments)
-    print(f"Network: {len(out_degrees)} nodes with out-edges")
-    
+    src, dst, names = build_edges(posts, comments)
+    out_counts, in_counts = degree_counts(src, dst, len(names))
+    print(f"Network: {int((out_counts > 0).sum())} nodes with out-edges")
+
     print("Generating degree distribution data...")
-    generate_degree_distribution_data(out_degrees, "out_degree_dist.csv")
-    generate_degree_distribution_data(in_degrees, "in_degree_dist.csv")
-    
+    generate_degree_distribution_data(out_counts[out_counts > 0], "out_degree_dist.csv")
+    generate_degree_distribution_data(in_counts[in_counts > 0], "in_degree_dist.csv")
+
     print("Generating LaTeX tables...")
-    generate_latex_table(posts, comments, out_degrees, in_degrees)
-    generate_top_agents_table(out_degrees, in_degrees)
-    
+    generate_latex_table(posts, comments, out_counts, in_counts)
+    generate_top_agents_table(out_counts, in_counts, names)
+
     print(f"\nOutput saved to {OUT_DIR}")
     print("Files:")
     for f in OUT_DIR.iterdir():
@@ -5,23 +5,129 @@ Day 2 analysis for paper.
 """
 
 import json
-from pathlib import Path
-from collections import defaultdict, Counter
-import statistics
+import mmap
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from _common import top_k_ids
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+N_WORKERS = os.cpu_count() or 1
+
+if HAS_NUMBA:
+    # Sort-based CSR build: order edges by packed (src, tgt) key, then
+    # run-length encode duplicates. One pass, no hash maps, no
+    # interpreter in the loop.
+    @njit(cache=True)
+    def _csr_from_edges(src, tgt, n_nodes):
+        key = src.astype(np.int64) * n_nodes + tgt
+        order = np.argsort(key)
+
+        indptr = np.zeros(n_nodes + 1, np.int64)
+        indices = np.empty(src.shape[0], np.int32)
+        data = np.empty(src.shape[0], np.int64)
+        nnz = 0
+        prev = np.int64(-1)
+        for idx in order:
+            k = key[idx]
+            if k == prev:
+                data[nnz - 1] += 1
+            else:
+                indices[nnz] = tgt[idx]
+                data[nnz] = 1
+                indptr[src[idx] + 1] += 1
+                nnz += 1
+                prev = k
+        for r in range(n_nodes):  # row counts -> row offsets
+            indptr[r + 1] += indptr[r]
+        return indptr, indices[:nnz], data[:nnz]
 
 DATA_DIR = Path.home() / ".openclaw/workspace/data/moltbook-archive-v2"
 
 # Stream loading for large files
 def stream_load(filepath, limit=None):
     """Stream load JSONL, optionally with limit."""
-    count = 0
-    with open(filepath) as f:
-        for line in f:
-            if limit and count >= limit:
-                break
-            yield json.loads(line)
-            count += 1
+    with open(filepath, "r", buffering=1 << 20, encoding="utf-8") as f:
+        for line in islice(f, limit) if limit else f:
+            yield json_loads(line)
+
+def _shard_bounds(filepath, n_shards):
+    """Split a file into byte ranges snapped forward to newline boundaries."""
+    size = filepath.stat().st_size
+    bounds = [size * i // n_shards for i in range(n_shards + 1)]
+    with open(filepath, "rb") as f:
+        for i in range(1, n_shards):
+            f.seek(bounds[i])
+            f.readline()  # snap to the start of the next full line
+            bounds[i] = min(f.tell(), size)
+    return [(s, e) for s, e in zip(bounds, bounds[1:]) if e > s]
+
+def _parse_post_shard(args):
+    """Worker: parse one byte range of posts into (post_id, author) tuples."""
+    filepath, start, end = args
+    out = []
+    with open(filepath, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm.seek(start)
+        while mm.tell() < end:
+            p = json_loads(mm.readline())
+            # Happy path is one subscript chain; missing authors are rare
+            try:
+                author = p["author"]["name"]
+            except (TypeError, KeyError):
+                author = "unknown"
+            out.append((p.get("id"), author))
+    return out
+
+def _parse_comment_shard(args):
+    """Worker: parse one byte range of comments into (commenter, post_id) tuples."""
+    filepath, start, end = args
+    out = []
+    with open(filepath, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm.seek(start)
+        while mm.tell() < end:
+            c = json_loads(mm.readline())
+            try:
+                commenter = c["author"]["name"]
+            except (TypeError, KeyError):
+                commenter = "unknown"
+            out.append((commenter, c.get("_post_id") or c.get("post_id")))
+    return out
+
+def parallel_parse(filepath, worker):
+    """Stream records from a JSONL file parsed across a process pool.
+
+    pool.map preserves shard order, so downstream interning sees records
+    in the same order as a serial scan. Records are yielded shard by
+    shard, letting callers fold them straight into their own structures
+    without a whole-file list in between.
+    """
+    shards = _shard_bounds(filepath, N_WORKERS)
+    if len(shards) <= 1:
+        if shards:
+            yield from worker((filepath, *shards[0]))
+        return
+
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        for part in pool.map(worker, [(filepath, s, e) for s, e in shards]):
+            yield from part
 
 def main():
     posts_file = DATA_DIR / "posts_introductions.jsonl"
@@ -31,128 +137,130 @@ def main():
     print(f"Posts file: {posts_file}")
     print(f"Comments file: {comments_file}")
     
-    # Count records
-    print("\nCounting records...")
-    post_count = sum(1 for _ in open(posts_file))
-    comment_count = sum(1 for _ in open(comments_file))
+    # One fused pass per file: counting, interning and accumulation all
+    # consume the parsed shards as they stream out of the pool, so no
+    # whole-file record list is ever materialized.
+    # post_id -> author is a row-index dict plus a dense int32 array
+    # (SoA): the comment pass looks up a row, then reads the author id
+    # with one array access.
+    print(f"\nLoading posts ({N_WORKERS} workers)...")
+    name_to_id = {}
+    pid_to_idx = {}
+    author_ids = []
+    post_count = 0
+    for post_id, author in parallel_parse(posts_file, _parse_post_shard):
+        post_count += 1
+        if post_id not in pid_to_idx:
+            pid_to_idx[post_id] = len(author_ids)
+            author_ids.append(
+                name_to_id.setdefault(author, len(name_to_id))
+                if author != "unknown" else -1)
+    post_author_ids = np.array(author_ids, dtype=np.int32)
     print(f"Posts: {post_count:,}")
-    print(f"Comments: {comment_count:,}")
-    print(f"Total: {post_count + comment_count:,}")
-    
-    # Load posts to map post_id -> author
-    print("\nLoading posts...")
-    post_authors = {}
-    post_authors_set = set()
-    for p in stream_load(posts_file):
-        author_obj = p.get("author") or {}
-        author = author_obj.get("name", "unknown") if author_obj else "unknown"
-        post_authors[p.get("id")] = author
-        if author != "unknown":
-            post_authors_set.add(author)
-    print(f"Unique post authors: {len(post_authors_set):,}")
-    
+    print(f"Unique post authors: {len(name_to_id):,}")
+
     # Build network from comments
-    print("\nBuilding comment network (streaming)...")
-    adjacency = defaultdict(lambda: defaultdict(int))
-    commenters = set()
-    edge_count = 0
-    
-    for i, c in enumerate(stream_load(comments_file)):
-        if i % 500000 == 0 and i > 0:
-            print(f"  Processed {i:,} comments...")
-        
-        author_obj = c.get("author") or {}
-        commenter = author_obj.get("name", "unknown") if author_obj else "unknown"
-        post_id = c.get("_post_id") or c.get("post_id")
-        post_author = post_authors.get(post_id, "unknown")
-        
-        if commenter != "unknown" and post_author != "unknown" and commenter != post_author:
-            adjacency[commenter][post_author] += 1
-            commenters.add(commenter)
-            edge_count += 1
-    
-    all_nodes = post_authors_set | commenters
-    print(f"Total unique agents: {len(all_nodes):,}")
+    print(f"\nBuilding comment network ({N_WORKERS} workers)...")
+    src_ids, tgt_ids = [], []
+    comment_count = 0
+    for commenter, post_id in parallel_parse(comments_file, _parse_comment_shard):
+        comment_count += 1
+        row = pid_to_idx.get(post_id, -1)
+        if row < 0 or commenter == "unknown":
+            continue
+        tgt = post_author_ids[row]
+        if tgt < 0:
+            continue
+        # A self-commenting author is already interned, so no stray nodes
+        src = name_to_id.setdefault(commenter, len(name_to_id))
+        if src != tgt:
+            src_ids.append(src)
+            tgt_ids.append(int(tgt))
+    print(f"Comments: {comment_count:,}")
+    print(f"Total records: {post_count + comment_count:,}")
+
+    edge_count = len(src_ids)
+    n_nodes = len(name_to_id)
+    names = list(name_to_id)
+    src_arr = np.array(src_ids, dtype=np.int32)
+    tgt_arr = np.array(tgt_ids, dtype=np.int32)
+    if HAS_NUMBA:
+        indptr, indices, data = _csr_from_edges(src_arr, tgt_arr, n_nodes)
+        A = sp.csr_matrix((data, indices, indptr), shape=(n_nodes, n_nodes))
+    else:
+        A = sp.csr_matrix(
+            (np.ones(edge_count, dtype=np.int64), (src_arr, tgt_arr)),
+            shape=(n_nodes, n_nodes))
+        A.sum_duplicates()
+    print(f"Total unique agents: {n_nodes:,}")
     print(f"Total edges: {edge_count:,}")
-    
-    # Degree distributions
+
+    # Degree distributions: one CSR reduction per axis instead of dict loops
     print("\n=== Degree Statistics ===")
-    out_degrees = defaultdict(int)
-    in_degrees = defaultdict(int)
-    
-    for src, targets in adjacency.items():
-        out_degrees[src] = sum(targets.values())
-        for tgt, weight in targets.items():
-            in_degrees[tgt] += weight
-    
-    out_vals = [out_degrees.get(n, 0) for n in all_nodes]
-    in_vals = [in_degrees.get(n, 0) for n in all_nodes]
+    out_degrees = np.asarray(A.sum(axis=1)).ravel()
+    in_degrees = np.asarray(A.sum(axis=0)).ravel()
+
+    out_vals = out_degrees
+    in_vals = in_degrees
     
     print(f"Out-degree (comments given):")
-    print(f"  Mean: {statistics.mean(out_vals):.2f}")
-    print(f"  Median: {statistics.median(out_vals):.2f}")
-    print(f"  Max: {max(out_vals)}")
+    print(f"  Mean: {out_vals.mean():.2f}")
+    print(f"  Median: {np.median(out_vals):.2f}")
+    print(f"  Max: {out_vals.max()}")
     print(f"In-degree (comments received):")
-    print(f"  Mean: {statistics.mean(in_vals):.2f}")
-    print(f"  Median: {statistics.median(in_vals):.2f}")
-    print(f"  Max: {max(in_vals)}")
+    print(f"  Mean: {in_vals.mean():.2f}")
+    print(f"  Median: {np.median(in_vals):.2f}")
+    print(f"  Max: {in_vals.max()}")
     
-    # Top commenters
+    # Top commenters: O(N) selection, no full sort of millions of nodes
     print("\n=== Top 10 Commenters (out-degree) ===")
-    top_out = sorted(out_degrees.items(), key=lambda x: -x[1])[:10]
-    for name, deg in top_out:
-        print(f"  {name}: {deg:,}")
-    
+    for idx in top_k_ids(out_degrees):
+        print(f"  {names[idx]}: {out_degrees[idx]:,}")
+
     # Most commented-on (in-degree)
     print("\n=== Top 10 Most Commented-On (in-degree) ===")
-    top_in = sorted(in_degrees.items(), key=lambda x: -x[1])[:10]
-    for name, deg in top_in:
-        print(f"  {name}: {deg:,}")
-    
-    # Reciprocity
+    for idx in top_k_ids(in_degrees):
+        print(f"  {names[idx]}: {in_degrees[idx]:,}")
+
+    # Reciprocity: B ∧ Bᵀ over CSR indices runs in C, no per-edge lookups
     print("\n=== Reciprocity ===")
-    reciprocated = 0
-    total = 0
-    for src, targets in adjacency.items():
-        for tgt in targets:
-            total += 1
-            if src in adjacency.get(tgt, {}):
-                reciprocated += 1
+    B = A.astype(bool)
+    reciprocated = B.multiply(B.T).nnz
+    total = B.nnz
     recip_rate = reciprocated / total if total > 0 else 0
     print(f"Reciprocated edges: {reciprocated:,} / {total:,}")
     print(f"Reciprocity rate: {recip_rate:.4f} ({recip_rate*100:.2f}%)")
     
-    # Gini coefficient for out-degree
+    # Gini coefficient for out-degree: C-level sort plus one dot product
     print("\n=== Inequality (Gini) ===")
-    sorted_out = sorted(out_vals)
-    n = len(sorted_out)
+    sorted_out = np.sort(out_vals)
+    n = sorted_out.size
     if n > 0:
-        cumsum = sum((i + 1) * v for i, v in enumerate(sorted_out))
-        gini = (2 * cumsum) / (n * sum(sorted_out)) - (n + 1) / n if sum(sorted_out) > 0 else 0
+        total_out = sorted_out.sum()
+        cumsum = np.arange(1, n + 1, dtype=np.int64).dot(sorted_out)
+        gini = (2 * cumsum) / (n * total_out) - (n + 1) / n if total_out > 0 else 0
         print(f"Gini coefficient (out-degree): {gini:.4f}")
-    
+
     # One-time engagers
-    one_timers = sum(1 for v in out_vals if v == 1)
+    one_timers = int((out_vals == 1).sum())
     print(f"\nOne-time commenters: {one_timers:,} ({one_timers/len(out_vals)*100:.1f}%)")
     
     # Power law exponent estimate (via MLE)
     print("\n=== Power Law Analysis ===")
-    nonzero_out = [v for v in out_vals if v > 0]
-    if nonzero_out:
+    nonzero_out = out_vals[out_vals > 0].astype(np.float64)
+    if nonzero_out.size:
         xmin = 1
-        alpha = 1 + len(nonzero_out) / sum(log(v / xmin) for v in nonzero_out if v >= xmin)
+        alpha = 1 + nonzero_out.size / np.log(nonzero_out / xmin).sum()
         print(f"Estimated power-law exponent (α): {alpha:.2f}")
     
     print("\n=== Summary for Paper ===")
     print(f"Dataset: m/introductions (exhaustive)")
     print(f"Records: {post_count + comment_count:,}")
-    print(f"Unique agents: {len(all_nodes):,}")
+    print(f"Unique agents: {n_nodes:,}")
     print(f"Network edges: {edge_count:,}")
     print(f"Reciprocity: {recip_rate*100:.2f}%")
     print(f"Gini: {gini:.4f}")
     print(f"One-time commenters: {one_timers/len(out_vals)*100:.1f}%")
 
-from math import log
-
 if __name__ == "__main__":
     main()
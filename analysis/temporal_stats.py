@@ -4,131 +4,112 @@ Temporal analysis for Moltbook network.
 Analyzes time-based patterns in agent activity.
 """
 
-import json
 from pathlib import Path
-from collections import defaultdict, Counter
-from datetime import datetime, timezone
-import statistics
+import calendar
 
-DATA_DIR = Path.home() / ".openclaw/workspace/data/moltbook-sampler"
+import numpy as np
+import pandas as pd
 
-def parse_timestamp(ts_str):
-    """Parse ISO timestamp to datetime."""
-    if not ts_str:
-        return None
-    try:
-        # Handle various formats
-        ts_str = ts_str.replace('Z', '+00:00')
-        return datetime.fromisoformat(ts_str)
-    except:
-        return None
+DATA_DIR = Path.home() / ".openclaw/workspace/data/moltbook-sampler"
 
 def load_data_with_times():
-    """Load posts and comments with timestamps."""
-    posts = []
-    comments = []
-    
-    posts_file = DATA_DIR / "posts.jsonl"
-    comments_file = DATA_DIR / "comments.jsonl"
-    
-    if posts_file.exists():
-        with open(posts_file) as f:
-            for line in f:
-                p = json.loads(line)
-                p['_parsed_time'] = parse_timestamp(p.get('created_at'))
-                if p['_parsed_time']:
-                    posts.append(p)
-    
-    if comments_file.exists():
-        with open(comments_file) as f:
-            for line in f:
-                c = json.loads(line)
-                c['_parsed_time'] = parse_timestamp(c.get('created_at'))
-                if c['_parsed_time']:
-                    comments.append(c)
-    
-    return posts, comments
+    """Load posts and comments as DataFrames with parsed timestamps.
+
+    Timestamps are parsed in bulk with pd.to_datetime (batched C
+    strptime) instead of datetime.fromisoformat per line; rows without
+    a valid created_at are dropped.
+    """
+    frames = []
+    for name in ("posts.jsonl", "comments.jsonl"):
+        path = DATA_DIR / name
+        if path.exists():
+            df = pd.read_json(path, lines=True)
+            created = (df["created_at"] if "created_at" in df.columns
+                       else pd.Series(index=df.index, dtype=object))
+            df["_parsed_time"] = pd.to_datetime(
+                created, format="ISO8601", utc=True, errors="coerce")
+            df = df[df["_parsed_time"].notna()]
+        else:
+            df = pd.DataFrame(
+                {"_parsed_time": pd.Series(dtype="datetime64[ns, UTC]")})
+        frames.append(df)
+
+    return frames[0], frames[1]
 
 def analyze_time_distribution(items, label="items"):
     """Analyze temporal distribution of items."""
-    if not items:
+    times = items["_parsed_time"].sort_values()
+    if times.empty:
         return {}
-    
-    times = [i['_parsed_time'] for i in items if i.get('_parsed_time')]
-    if not times:
-        return {}
-    
-    # Sort by time
-    times.sort()
-    
+
     # Time range
-    earliest = min(times)
-    latest = max(times)
+    earliest = times.iloc[0]
+    latest = times.iloc[-1]
     span_days = (latest - earliest).total_seconds() / 86400
-    
-    # Hour of day distribution (UTC)
-    hours = Counter(t.hour for t in times)
-    
+
+    # Hour of day distribution (UTC): one C bincount, no per-row strftime
+    hour_counts = np.bincount(times.dt.hour.values, minlength=24)
+
     # Day of week distribution
-    days = Counter(t.strftime('%A') for t in times)
-    
+    dow_counts = np.bincount(times.dt.dayofweek.values, minlength=7)
+
     # Daily activity
-    daily = Counter(t.strftime('%Y-%m-%d') for t in times)
-    
+    daily = times.dt.floor('D').value_counts().sort_index()
+
     return {
         "count": len(times),
         "earliest": earliest.isoformat(),
         "latest": latest.isoformat(),
         "span_days": round(span_days, 2),
         "items_per_day": round(len(times) / max(span_days, 1), 2),
-        "peak_hour_utc": hours.most_common(1)[0] if hours else None,
-        "peak_day": days.most_common(1)[0] if days else None,
-        "hour_distribution": dict(sorted(hours.items())),
-        "daily_counts": dict(sorted(daily.items())[-7:]),  # Last 7 days
+        "peak_hour_utc": (int(hour_counts.argmax()), int(hour_counts.max())),
+        "peak_day": (calendar.day_name[dow_counts.argmax()], int(dow_counts.max())),
+        "hour_distribution": {h: int(c) for h, c in enumerate(hour_counts) if c},
+        "daily_counts": {ts.strftime('%Y-%m-%d'): int(c)
+                         for ts, c in daily.tail(7).items()},  # Last 7 days
     }
 
 def analyze_activity_patterns(posts, comments):
     """Analyze 24/7 vs human-like patterns."""
-    all_items = posts + comments
-    times = [i['_parsed_time'] for i in all_items if i.get('_parsed_time')]
-    
-    if not times:
+    times = pd.concat([posts["_parsed_time"], comments["_parsed_time"]])
+
+    if times.empty:
         return {}
-    
-    hours = Counter(t.hour for t in times)
-    total = sum(hours.values())
-    
+
+    # One 24-bin histogram; everything below is array math over it
+    hist = np.bincount(times.dt.hour.values, minlength=24)
+
     # Check if activity is uniform (24/7) or has peaks (human-like)
-    hour_fractions = [hours.get(h, 0) / total for h in range(24)]
-    
+    hour_fractions = hist / hist.sum()
+
     # Expected uniform: 1/24 = 0.0417 per hour
     # Calculate variance from uniform
     expected = 1/24
-    variance = sum((f - expected)**2 for f in hour_fractions) / 24
-    
+    variance = ((hour_fractions - expected) ** 2).sum() / 24
+
     # Coefficient of variation
-    mean_frac = statistics.mean(hour_fractions)
-    std_frac = statistics.stdev(hour_fractions) if len(hour_fractions) > 1 else 0
+    mean_frac = hour_fractions.mean()
+    std_frac = hour_fractions.std(ddof=1)
     cv = std_frac / mean_frac if mean_frac > 0 else 0
-    
+
     # Find quiet hours (< 50% of mean)
-    quiet_hours = [h for h in range(24) if hour_fractions[h] < mean_frac * 0.5]
-    busy_hours = [h for h in range(24) if hour_fractions[h] > mean_frac * 1.5]
-    
+    quiet_hours = np.where(hour_fractions < mean_frac * 0.5)[0].tolist()
+    busy_hours = np.where(hour_fractions > mean_frac * 1.5)[0].tolist()
+
     return {
-        "variance_from_uniform": round(variance, 6),
-        "coefficient_of_variation": round(cv, 3),
+        "variance_from_uniform": round(float(variance), 6),
+        "coefficient_of_variation": round(float(cv), 3),
         "pattern": "24/7 uniform" if cv < 0.3 else "human-like peaks",
         "quiet_hours_utc": quiet_hours,
         "busy_hours_utc": busy_hours,
-        "busiest_hour_utc": max(range(24), key=lambda h: hours.get(h, 0)),
-        "quietest_hour_utc": min(range(24), key=lambda h: hours.get(h, 0)),
+        "busiest_hour_utc": int(hist.argmax()),
+        "quietest_hour_utc": int(hist.argmin()),
     }
 
 def analyze_growth_curve(posts, comments):
     """Analyze cumulative growth over time."""
-    all_items = [(i['_parsed_time'], 'post' if 'title' in i else 'comment') 
-                 for i in posts + comments if i.get('_parsed_time')]
+    all_items = ([(t, 'post') for t in posts["_parsed_time"]]
+                 + [(t, 'comment') for t in comments["_parsed_time"]])
     all_items.sort()
     
     if not all_items: